@@ -1,9 +1,106 @@
+import functools
+import ipaddress
+import operator
+import re
+
 from pyats.utils.exceptions import SchemaEmptyParserError
 
 from networktests.testcases.base import DiagNetTest, depends_on
 
 __author__ = "Luka Pacar"
 
+_NAT_ADDRESS = r"(?:---|\d+\.\d+\.\d+\.\d+(?::\d+)?)"
+_TRANSLATION_RE = re.compile(
+    rf"^(?P<protocol>\S+)\s+(?P<inside_global>{_NAT_ADDRESS})\s+"
+    rf"(?P<inside_local>{_NAT_ADDRESS})\s+(?P<outside_local>{_NAT_ADDRESS})\s+"
+    rf"(?P<outside_global>{_NAT_ADDRESS})\s*$",
+    re.MULTILINE,
+)
+""" Matches one row of 'show ip nat translations'. """
+
+_TRANSLATION_NOISE_RE = re.compile(
+    r"^\s*(?:Pro\s+Inside global|Total number of translations|$)"
+)
+""" Matches the header, summary and blank lines around the translation rows. """
+
+_INSIDE_ADDRESSES = operator.itemgetter("inside_local", "inside_global")
+""" Extracts the (inside local, inside global) pair of a translation row. """
+
+_INTERFACE_TARGETS = {
+    "fastethernet": "FastEthernet",
+    "gigabitethernet": "GigabitEthernet",
+    "loopback": "Loopback",
+    "tunnel": "Tunnel",
+    "vlan": "Vlan",
+    "port-channel": "Port-Channel",
+    "serial": "Serial",
+}
+_INTERFACE_SHORT_NAMES = {
+    "fa": "fastethernet",
+    "gig": "gigabitethernet",
+    "lo": "loopback",
+    "tu": "tunnel",
+    "vl": "vlan",
+    "po": "port-channel",
+    "se": "serial",
+}
+_INTERFACE_RE = re.compile(r"^([a-zA-Z\-]+)\s*(\d.*)$")
+
+
+@functools.lru_cache(maxsize=1024)
+def _canonical_interface(name: str) -> str:
+    """
+    Expands an abbreviated interface name (e.g. Gi0/1) the same way the
+    cisco-interface datatype does in the frontend, lower-cased for comparison.
+    """
+    trimmed = name.strip()
+    match = _INTERFACE_RE.match(trimmed)
+    if not match:
+        return trimmed.lower()
+
+    prefix, identifier = match.group(1).lower(), match.group(2)
+    matches = {
+        formal for key, formal in _INTERFACE_TARGETS.items() if key.startswith(prefix)
+    } | {
+        _INTERFACE_TARGETS[target]
+        for short, target in _INTERFACE_SHORT_NAMES.items()
+        if short.startswith(prefix)
+    }
+    if len(matches) == 1:
+        return f"{matches.pop()}{identifier}".lower()
+    return trimmed.lower()
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_ip(ip_port_str: str) -> str:
+    """Strips the port from an 'address:port' translation field."""
+    if not ip_port_str or ":" not in ip_port_str:
+        return ip_port_str
+    return ip_port_str.partition(":")[0]
+
+
+def _read_translations(raw_output: str):
+    """
+    Reads the rows of 'show ip nat translations' output with _TRANSLATION_RE.
+    Returns None if any other line is not recognised, so no row is dropped silently.
+    """
+    rows = []
+    for line in raw_output.splitlines():
+        match = _TRANSLATION_RE.match(line)
+        if match:
+            rows.append(match.groupdict())
+        elif not _TRANSLATION_NOISE_RE.match(line):
+            return None
+    return rows
+
+
+def _same_address(expected: str, actual: str) -> bool:
+    """Compares two IPv4 addresses or netmasks by value, falling back to plain equality."""
+    try:
+        return ipaddress.IPv4Address(expected) == ipaddress.IPv4Address(actual)
+    except ValueError:
+        return expected == actual
+
 
 class NAT(DiagNetTest):
     """
@@ -256,196 +353,283 @@ class NAT(DiagNetTest):
         },
     ]
 
-    def _get_clean_ip(self, ip_port_str: str) -> str:
-        if not ip_port_str or ip_port_str == "---":
-            return ip_port_str
-        return ip_port_str.split(":")[0]
+    __slots__ = (
+        # Parameters
+        "device",
+        "vrf",
+        "nat_interfaces",
+        "min_active_translations",
+        "validation_mode",
+        "static_rules",
+        "pool_name",
+        "expected_pool_start",
+        "expected_pool_end",
+        "expected_pool_netmask",
+        "overload_interface",
+        # Telemetry gathered by the tests
+        "genie_dev",
+        "stats",
+        "translations",
+        "pools",
+    )
+
+    vrf: str
+    nat_interfaces: list | None
+    min_active_translations: int | None
+    static_rules: list | None
+    pool_name: str | None
+    expected_pool_start: str | None
+    expected_pool_end: str | None
+    expected_pool_netmask: str | None
+    overload_interface: str | None
+
+    def __init__(self):
+        # Optional parameters are only set by run() when supplied.
+        self.vrf = "default"
+        self.nat_interfaces = None
+        self.min_active_translations = None
+        self.static_rules = None
+        self.pool_name = None
+        self.expected_pool_start = None
+        self.expected_pool_end = None
+        self.expected_pool_netmask = None
+        self.overload_interface = None
 
     def test_connectivity(self) -> bool:
         if not self.device.can_connect():
             raise ValueError(f"Target {self.device.name} is unreachable.")
         return True
 
+    @staticmethod
+    def _execute(genie_dev, commands: list) -> dict:
+        # A single command is sent on its own; unicon only returns a dict for several.
+        if len(commands) > 1:
+            return genie_dev.execute(commands)
+        return {command: genie_dev.execute(command) for command in commands}
+
     @depends_on("test_connectivity")
     def test_fetch_telemetry(self) -> bool:
-        genie_dev = self.device.get_genie_device_object()
-        vrf = getattr(self, "vrf", "default") or "default"
+        vrf = self.vrf or "default"
+        # Only the Static checks read individual translations; the other modes get by on statistics.
+        needs_translations = self.validation_mode == "Static"
+
+        self.genie_dev = self.device.get_genie_device_object()
+        genie_dev = self.genie_dev
 
         cmd_stats = "show ip nat statistics"
+        # The global table is not a VRF on IOS/IOS-XE, so only named VRFs are filtered.
         cmd_trans = "show ip nat translations"
         if vrf != "default":
             cmd_trans += f" vrf {vrf}"
 
+        commands = [cmd_stats, cmd_trans] if needs_translations else [cmd_stats]
+
+        # Send both commands in one execute call and parse the captured output locally.
         try:
-            self.stats = genie_dev.parse(cmd_stats)
-        except SchemaEmptyParserError:
-            self.stats = {}
+            outputs = self._execute(genie_dev, commands)
         except Exception as e:
             raise ValueError(
-                f"Critical failure parsing NAT statistics on {self.device.name}: {str(e)}"
+                f"Critical failure querying NAT telemetry on {self.device.name}: {str(e)}"
             )
 
         try:
-            raw_trans = genie_dev.parse(cmd_trans)
-            vrf_data = raw_trans.get("vrf", {}).get(vrf, {})
-            idx_data = vrf_data.get("index", {})
-
-            if isinstance(idx_data, dict):
-                self.translations = list(idx_data.values())
-            else:
-                self.translations = []
-
+            self.stats = genie_dev.parse(cmd_stats, output=outputs[cmd_stats])
         except SchemaEmptyParserError:
-            self.translations = []
-
+            self.stats = {}
         except Exception as e:
             raise ValueError(
-                f"Critical failure parsing NAT translations on {self.device.name}: {str(e)}"
+                f"Critical failure parsing NAT statistics on {self.device.name}: {str(e)}"
             )
 
+        self.translations = []
+        if needs_translations:
+            raw_output = outputs[cmd_trans] or ""
+            # Read the table rows directly; only unfamiliar output goes through Genie.
+            rows = _read_translations(raw_output)
+            self.translations = rows or []
+
+            try:
+                if rows is None:
+                    raw_trans = genie_dev.parse(cmd_trans, output=raw_output)
+                    vrf_data = raw_trans.get("vrf", {}).get(vrf, {})
+                    idx_data = vrf_data.get("index", {})
+
+                    if isinstance(idx_data, dict):
+                        # Same row layout as the regex path, with absent columns as None.
+                        self.translations = [
+                            {
+                                field: entry.get(field)
+                                for field in _TRANSLATION_RE.groupindex
+                            }
+                            for entry in idx_data.values()
+                        ]
+
+            except SchemaEmptyParserError:
+                self.translations = []
+
+            except Exception as e:
+                raise ValueError(
+                    f"Critical failure parsing NAT translations on {self.device.name}: {str(e)}"
+                )
+
         return True
 
     @depends_on("test_fetch_telemetry")
     def test_audit_interfaces(self) -> bool:
-        if not getattr(self, "nat_interfaces", None):
+        if not self.nat_interfaces:
             return True
 
         op_ints = self.stats.get("interfaces", {})
+        if not op_ints:
+            raise ValueError(
+                "Interface Audit Failed: NAT statistics report no inside or outside interfaces."
+            )
+
+        configured_interfaces = {
+            role: frozenset(
+                _canonical_interface(str(name)) for name in op_ints.get(role, ())
+            )
+            for role in ("inside", "outside")
+        }
         errors = []
 
         for req in self.nat_interfaces:
             target = req["interface"]
             role = "inside" if req["direction"] == "Ingoing" else "outside"
 
-            configured_interfaces = op_ints.get(role, [])
-
-            if target not in configured_interfaces:
+            if _canonical_interface(str(target)) not in configured_interfaces[role]:
                 errors.append(f"{target} is not configured as NAT {role}")
 
         if errors:
             raise ValueError(f"Interface Audit Failed: {', '.join(errors)}")
         return True
 
-    @depends_on("test_audit_interfaces")
-    def test_validate_nat_operation(self) -> bool:
-        mode = self.validation_mode
+    @depends_on("test_fetch_telemetry")
+    def test_active_translations(self) -> bool:
+        if not self.min_active_translations:
+            return True
 
-        if getattr(self, "min_active_translations", None):
-            total = self.stats.get("active_translations", {}).get("total", 0)
-            if total < self.min_active_translations:
-                raise ValueError(
-                    f"Active translations (found: {total}) are below the minimum "
-                    f"threshold ({self.min_active_translations})."
-                )
+        active = self.stats.get("active_translations", {})
+        total = active.get("total", 0)
+        if total < self.min_active_translations:
+            raise ValueError(
+                f"Active translations (found: {total}) are below the minimum "
+                f"threshold ({self.min_active_translations})."
+            )
+        return True
 
-        # Static NAT
-        if mode == "Static":
-            if not self.translations:
-                raise ValueError(
-                    "Static validation failed: NAT translation table is empty."
-                )
+    def _validate_static(self) -> None:
+        static_rules = self.static_rules
+        if not static_rules:
+            # Nothing to validate; an empty table is not a failure here.
+            return
 
-            static_rules = getattr(self, "static_rules", None)
-            if not static_rules:
-                raise ValueError(
-                    "Static validation failed: static_rules is not configured or is empty."
-                )
+        if not self.translations:
+            raise ValueError(
+                "Static validation failed: NAT translation table is empty."
+            )
 
-            for rule in static_rules:
-                target_local = rule["inside_local"]
-                target_global = rule["inside_global"]
-                found_match = False
-
-                for entry in self.translations:
-                    current_local = self._get_clean_ip(entry.get("inside_local"))
-                    current_global = self._get_clean_ip(entry.get("inside_global"))
-
-                    if (
-                        current_local == target_local
-                        and current_global == target_global
-                    ):
-                        found_match = True
-                        break
-
-                if not found_match:
-                    raise ValueError(
-                        f"Static Map missing: {target_local} -> {target_global}"
-                    )
-
-        # Dynamic NAT
-        elif mode == "Dynamic":
-            mappings = (
-                self.stats.get("dynamic_mappings", {})
-                .get("inside_source", {})
-                .get("id", {})
+        # Rows with an unset ("---") inside address can never match a rule.
+        translated_pairs = {
+            pair
+            for pair in (
+                tuple(map(_clean_ip, _INSIDE_ADDRESSES(entry)))
+                for entry in self.translations
             )
-            pool_data = None
+            if "---" not in pair
+        }
 
-            if not self.pool_name:
+        for rule in static_rules:
+            target_local = rule["inside_local"]
+            target_global = rule["inside_global"]
+
+            if (target_local, target_global) not in translated_pairs:
                 raise ValueError(
-                    "Validation Mode 'Dynamic' requires a 'pool_name' parameter, but none was provided."
+                    f"Static Map missing: {target_local} -> {target_global}"
                 )
 
-            for mapping_entry in mappings.values():
-                pool_config = mapping_entry.get("pool", {})
-                if self.pool_name in pool_config:
-                    pool_data = pool_config[self.pool_name]
-                    break
-
-            if not pool_data:
-                raise ValueError(f"Pool {self.pool_name} not found.")
-
-            if pool_data.get("misses", 0) > 0:
-                raise ValueError(f"Pool {self.pool_name} has allocation misses!")
-
-            conf_errors = []
-
-            if getattr(self, "expected_pool_start", None):
-                actual_start = pool_data.get("start")
-                if actual_start != self.expected_pool_start:
-                    conf_errors.append(
-                        f"Start IP Mismatch (Exp: {self.expected_pool_start}, Got: {actual_start})"
-                    )
-
-            if getattr(self, "expected_pool_end", None):
-                actual_end = pool_data.get("end")
-                if actual_end != self.expected_pool_end:
-                    conf_errors.append(
-                        f"End IP Mismatch (Exp: {self.expected_pool_end}, Got: {actual_end})"
-                    )
-
-            if getattr(self, "expected_pool_netmask", None):
-                actual_mask = pool_data.get("netmask")
-                if actual_mask != self.expected_pool_netmask:
-                    conf_errors.append(
-                        f"Netmask Mismatch (Exp: {self.expected_pool_netmask}, Got: {actual_mask})"
-                    )
-
-            if conf_errors:
-                raise ValueError(f"Pool Config Mismatch: {', '.join(conf_errors)}")
-
-        # Overload / PAT Validation
-        elif mode == "NAT/PAT - Overload":
-            mappings = (
-                self.stats.get("dynamic_mappings", {})
-                .get("inside_source", {})
-                .get("id", {})
+    def _validate_dynamic(self) -> None:
+        mappings = (
+            self.stats.get("dynamic_mappings", {})
+            .get("inside_source", {})
+            .get("id", {})
+        )
+
+        if not self.pool_name:
+            raise ValueError(
+                "Validation Mode 'Dynamic' requires a 'pool_name' parameter, but none was provided."
             )
-            found_overload = False
 
-            if not self.overload_interface:
-                raise ValueError(
-                    "Validation Mode 'NAT/PAT - Overload' requires a 'overload_interface' parameter, but none was provided."
+        # First mapping wins, matching the order a linear search would find.
+        self.pools = {}
+        for mapping_entry in mappings.values():
+            for name, pool_config in mapping_entry.get("pool", {}).items():
+                self.pools.setdefault(name, pool_config)
+
+        pool_data = self.pools.get(self.pool_name)
+        if not pool_data:
+            raise ValueError(f"Pool {self.pool_name} not found.")
+
+        if pool_data.get("misses", 0) > 0:
+            raise ValueError(f"Pool {self.pool_name} has allocation misses!")
+
+        conf_errors = []
+
+        if self.expected_pool_start:
+            actual_start = pool_data.get("start")
+            if not _same_address(self.expected_pool_start, actual_start):
+                conf_errors.append(
+                    f"Start IP Mismatch (Exp: {self.expected_pool_start}, Got: {actual_start})"
+                )
+
+        if self.expected_pool_end:
+            actual_end = pool_data.get("end")
+            if not _same_address(self.expected_pool_end, actual_end):
+                conf_errors.append(
+                    f"End IP Mismatch (Exp: {self.expected_pool_end}, Got: {actual_end})"
+                )
+
+        if self.expected_pool_netmask:
+            actual_mask = pool_data.get("netmask")
+            if not _same_address(self.expected_pool_netmask, actual_mask):
+                conf_errors.append(
+                    f"Netmask Mismatch (Exp: {self.expected_pool_netmask}, Got: {actual_mask})"
                 )
 
-            for mapping_entry in mappings.values():
-                interface_name = str(mapping_entry.get("interface", ""))
-                overload_interface = str(self.overload_interface)
-                if interface_name.strip().lower() == overload_interface.strip().lower():
-                    found_overload = True
-                    break
+        if conf_errors:
+            raise ValueError(f"Pool Config Mismatch: {', '.join(conf_errors)}")
 
-            if not found_overload:
-                raise ValueError(f"PAT not bound to {self.overload_interface}")
+    def _validate_overload(self) -> None:
+        mappings = (
+            self.stats.get("dynamic_mappings", {})
+            .get("inside_source", {})
+            .get("id", {})
+        )
 
+        if not self.overload_interface:
+            raise ValueError(
+                "Validation Mode 'NAT/PAT - Overload' requires a 'overload_interface' parameter, but none was provided."
+            )
+
+        target_interface = _canonical_interface(str(self.overload_interface))
+        bound_interfaces = {
+            _canonical_interface(str(mapping_entry.get("interface", "")))
+            for mapping_entry in mappings.values()
+        }
+
+        if target_interface not in bound_interfaces:
+            raise ValueError(f"PAT not bound to {self.overload_interface}")
+
+    _MODE_HANDLERS = {
+        "Static": _validate_static,
+        "Dynamic": _validate_dynamic,
+        "NAT/PAT - Overload": _validate_overload,
+    }
+    """ Validation routine per validation_mode. """
+
+    @depends_on("test_fetch_telemetry")
+    def test_validate_nat_operation(self) -> bool:
+        handler = self._MODE_HANDLERS.get(self.validation_mode)
+        if handler:
+            handler(self)
         return True
@@ -1,9 +1,68 @@
+import functools
 import ipaddress
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 
-from networktests.testcases.base import DiagNetTest, depends_on
+from networktests.testcases.base import DiagNetTest, TTLCache, depends_on
 
 __author__ = "Luka Pacar"
 
+_OSPF_STATES = {
+    state: state
+    for state in (
+        "FULL",
+        "2-WAY",
+        "EXSTART",
+        "EXCHANGE",
+        "LOADING",
+        "INIT",
+        "ATTEMPT",
+        "DOWN",
+    )
+}
+""" Known adjacency states, so cleaned states reuse one shared string each. """
+
+_EMPTY = MappingProxyType({})
+""" Shared read-only fallback for missing levels of the Genie output. """
+
+
+@functools.lru_cache(maxsize=64)
+def _clean_state(raw_state: str) -> str:
+    """Reduces a Genie neighbor state such as 'FULL/DR' to the bare adjacency state."""
+    state = raw_state.partition("/")[0].strip().upper()
+    return _OSPF_STATES.get(state, state)
+
+
+@functools.lru_cache(maxsize=4096)
+def _network_key(address: str) -> tuple:
+    """
+    Returns (network address as int, prefix length) for an 'a.b.c.d/len' string,
+    using plain integer math instead of building ipaddress objects.
+    Cached, as the same peers are checked again and again.
+    """
+    ip, _, prefix = address.partition("/")
+    octets = ip.split(".")
+    prefix = prefix or "32"
+    if (
+        len(octets) != 4
+        or not all(o.isdigit() and int(o) <= 255 for o in octets)
+        or not (prefix.isdigit() and int(prefix) <= 32)
+    ):
+        # Anything unusual (netmask notation, IPv6, malformed input) goes through
+        # ipaddress, which also raises the ValueError for invalid addresses.
+        network = ipaddress.ip_interface(address).network
+        return int(network.network_address), network.prefixlen
+
+    a, b, c, d = map(int, octets)
+    prefixlen = int(prefix)
+    mask = (0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF
+    return ((a << 24) | (b << 16) | (c << 8) | d) & mask, prefixlen
+
+
+def _genie_parse(genie_dev, command: str):
+    """Parses a command with Genie; the default parser of _parse_on_peers."""
+    return genie_dev.parse(command)
+
 
 class OSPF_Adjacency(DiagNetTest):
     """
@@ -150,62 +209,131 @@ class OSPF_Adjacency(DiagNetTest):
         },
     ]
 
+    _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ospf-parse")
+    """ Shared by all runs; worker threads are started on first use and reused. """
+
+    _parse_cache = TTLCache()
+    """ Recently parsed output per (device, command), shared across runs. """
+
+    __slots__ = (
+        # Parameters
+        "device_a",
+        "device_b",
+        "vrf",
+        "expected_state",
+        "audit_config_consistency",
+        "area_id",
+        # State gathered by the tests
+        "ospf_cmd_prefix",
+        "genie_dev_a",
+        "genie_dev_b",
+        "rid_a",
+        "rid_b",
+        "local_int_name_a",
+        "local_int_name_b",
+        "link_data_a",
+        "link_data_b",
+    )
+
+    def _setup(self):
+        # Resolve the VRF context and its command prefix once per run.
+        self.vrf = getattr(self, "vrf", "default") or "default"
+        self.ospf_cmd_prefix = (
+            "show ip ospf" if self.vrf == "default" else f"show ip ospf vrf {self.vrf}"
+        )
+
     def _to_clean_state(self, raw_state):
-        return str(raw_state).split("/")[0].strip().upper() if raw_state else "DOWN"
+        return _clean_state(str(raw_state)) if raw_state else "DOWN"
 
     def _get_vrf_instance(self, raw_data):
-        target_vrf = getattr(self, "vrf", "default") or "default"
         return (
-            raw_data.get("vrf", {})
-            .get(target_vrf, {})
-            .get("address_family", {})
-            .get("ipv4", {})
-            .get("instance", {})
+            raw_data.get("vrf", _EMPTY)
+            .get(self.vrf, _EMPTY)
+            .get("address_family", _EMPTY)
+            .get("ipv4", _EMPTY)
+            .get("instance", _EMPTY)
         )
 
-    def _extract_neighbor_map(self, raw_data):
-        if not raw_data:
-            return {}
-        neighbor_map = {}
+    def _walk_interfaces(self, raw_data):
+        """Yields (area_id, interface_name, details) for every interface in the VRF instance."""
         for instance in self._get_vrf_instance(raw_data).values():
-            for area in instance.get("areas", {}).values():
-                for interface in area.get("interfaces", {}).values():
-                    for rid, nbr in interface.get("neighbors", {}).items():
-                        state = nbr.get("state")
-                        if state:
-                            neighbor_map[rid] = self._to_clean_state(state)
-        return neighbor_map
+            for area_id, area_data in instance.get("areas", _EMPTY).items():
+                for name, details in area_data.get("interfaces", _EMPTY).items():
+                    yield area_id, name, details
+
+    def _find_neighbor_state(self, raw_data, target_rid):
+        if not raw_data:
+            return "DOWN"
+        for _, _, interface in self._walk_interfaces(raw_data):
+            nbr = interface.get("neighbors", _EMPTY).get(target_rid)
+            if nbr and nbr.get("state"):
+                return self._to_clean_state(nbr["state"])
+        return "DOWN"
 
     def _get_router_id_and_interfaces(self, raw_data):
         router_id = None
         interfaces = {}
-        for instance in self._get_vrf_instance(raw_data).values():
-            for area_id, area_data in instance.get("areas", {}).items():
-                area_ints = area_data.get("interfaces", {})
-                for name, details in area_ints.items():
-                    details["area_id_found"] = area_id
-                    interfaces[name] = details
-                    if not router_id:
-                        router_id = details.get("router_id")
+        for area_id, name, details in self._walk_interfaces(raw_data):
+            if not router_id:
+                router_id = details.get("router_id")
+            # Only addressed interfaces can form the shared link.
+            if not details.get("ip_address"):
+                continue
+            # Annotate a copy; the parsed output may be shared through the parse cache.
+            interfaces[name] = {**details, "area_id_found": area_id}
         return router_id, interfaces
 
+    def _cached_parse(self, device, genie_dev, command, parse):
+        # Adjacency checks that share a router reuse its interface table for a few seconds.
+        key = (device.pk, command)
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = parse(genie_dev, command)
+        if result:
+            self._parse_cache.set(key, result)
+        return result
+
+    def _parse_on_peers(self, cmd_a, cmd_b, parse=None, cache=False):
+        """
+        Parses one command on each peer concurrently, returning (result_a, result_b).
+        Only output that does not decide the live state should be cached.
+        """
+        parse = parse or _genie_parse
+
+        def fetch(device, genie_dev, command):
+            if cache:
+                return self._cached_parse(device, genie_dev, command, parse)
+            return parse(genie_dev, command)
+
+        # Both peers on one device share a single CLI session, which cannot be driven in parallel.
+        if self.device_a.pk == self.device_b.pk:
+            return (
+                fetch(self.device_a, self.genie_dev_a, cmd_a),
+                fetch(self.device_b, self.genie_dev_b, cmd_b),
+            )
+
+        future_a = self._executor.submit(fetch, self.device_a, self.genie_dev_a, cmd_a)
+        future_b = self._executor.submit(fetch, self.device_b, self.genie_dev_b, cmd_b)
+        return future_a.result(), future_b.result()
+
     def test_connectivity(self) -> bool:
         for device in [self.device_a, self.device_b]:
             if not device.can_connect():
+                self._parse_cache.evict_device(device.pk)
                 raise ValueError(f"Target {device.name} is unreachable.")
+
+        # Each lookup health-checks the session, so resolve the handles once per run.
+        self.genie_dev_a = self.device_a.get_genie_device_object()
+        self.genie_dev_b = self.device_b.get_genie_device_object()
         return True
 
     @depends_on("test_connectivity")
     def test_discover_shared_link(self) -> bool:
-        vrf = getattr(self, "vrf", "default") or "default"
-        cmd = (
-            "show ip ospf interface"
-            if vrf == "default"
-            else f"show ip ospf vrf {vrf} interface"
-        )
+        cmd = f"{self.ospf_cmd_prefix} interface"
 
-        raw_a = self.device_a.get_genie_device_object().parse(cmd)
-        raw_b = self.device_b.get_genie_device_object().parse(cmd)
+        raw_a, raw_b = self._parse_on_peers(cmd, cmd, cache=True)
 
         self.rid_a, ints_a = self._get_router_id_and_interfaces(raw_a)
         self.rid_b, ints_b = self._get_router_id_and_interfaces(raw_b)
@@ -215,27 +343,28 @@ class OSPF_Adjacency(DiagNetTest):
                 f"Could not resolve Router-IDs (A: {self.rid_a}, B: {self.rid_b})"
             )
 
-        found_overlap = False
-        for name_a, details_a in ints_a.items():
-            if not details_a.get("ip_address"):
-                continue
-            net_a = ipaddress.ip_interface(details_a["ip_address"]).network
-
-            for name_b, details_b in ints_b.items():
-                if not details_b.get("ip_address"):
-                    continue
-                if net_a == ipaddress.ip_interface(details_b["ip_address"]).network:
-                    self.local_int_name_a, self.local_int_name_b = name_a, name_b
-                    self.link_data_a, self.link_data_b = details_a, details_b
-                    found_overlap = True
-                    break
-            if found_overlap:
-                break
-
-        if not found_overlap:
+        # Index peer B by subnet once; the first interface per subnet wins.
+        networks_b = {}
+        for name_b, details_b in ints_b.items():
+            net_b = _network_key(details_b["ip_address"])
+            networks_b.setdefault(net_b, (name_b, details_b))
+
+        match = next(
+            (
+                (name_a, details_a, *networks_b[net_a])
+                for name_a, details_a in ints_a.items()
+                if (net_a := _network_key(details_a["ip_address"])) in networks_b
+            ),
+            None,
+        )
+        if match is None:
             raise ValueError(
                 "Topology Mismatch: No shared OSPF subnet found between peers."
             )
+
+        name_a, details_a, name_b, details_b = match
+        self.local_int_name_a, self.local_int_name_b = name_a, name_b
+        self.link_data_a, self.link_data_b = details_a, details_b
         return True
 
     @depends_on("test_discover_shared_link")
@@ -244,38 +373,27 @@ class OSPF_Adjacency(DiagNetTest):
             return True
 
         errors = []
+        link_a, link_b = self.link_data_a, self.link_data_b
 
         # Timers
-        h_a, d_a = (
-            self.link_data_a.get("hello_interval"),
-            self.link_data_a.get("dead_interval"),
-        )
-        h_b, d_b = (
-            self.link_data_b.get("hello_interval"),
-            self.link_data_b.get("dead_interval"),
-        )
-        if h_a != h_b or d_a != d_b:
+        timers_a = (link_a.get("hello_interval"), link_a.get("dead_interval"))
+        timers_b = (link_b.get("hello_interval"), link_b.get("dead_interval"))
+        if timers_a != timers_b:
             errors.append(
-                f"Timer Mismatch! {self.device_a.name}: {h_a}/{d_a}, {self.device_b.name}: {h_b}/{d_b}"
+                f"Timer Mismatch! {self.device_a.name}: {timers_a[0]}/{timers_a[1]}, "
+                f"{self.device_b.name}: {timers_b[0]}/{timers_b[1]}"
             )
 
         # Area ID
-        ar_a, ar_b = (
-            self.link_data_a.get("area_id_found"),
-            self.link_data_b.get("area_id_found"),
-        )
+        ar_a, ar_b = link_a.get("area_id_found"), link_b.get("area_id_found")
         if ar_a != ar_b:
             errors.append(f"Area Mismatch! Peer A: {ar_a}, Peer B: {ar_b}")
-        if getattr(self, "area_id", None) and str(ar_a) != str(self.area_id):
-            errors.append(
-                f"Area ID Override Failure! Found {ar_a}, Expected {self.area_id}"
-            )
+        area_id = getattr(self, "area_id", None)
+        if area_id and str(ar_a) != str(area_id):
+            errors.append(f"Area ID Override Failure! Found {ar_a}, Expected {area_id}")
 
         # Network Type
-        nt_a, nt_b = (
-            self.link_data_a.get("interface_type"),
-            self.link_data_b.get("interface_type"),
-        )
+        nt_a, nt_b = link_a.get("interface_type"), link_b.get("interface_type")
         if nt_a != nt_b:
             errors.append(f"Network Type Mismatch! Peer A: {nt_a}, Peer B: {nt_b}")
 
@@ -287,25 +405,19 @@ class OSPF_Adjacency(DiagNetTest):
     @depends_on("test_config_audit")
     def test_validate_state_targeted(self) -> bool:
         """Step 4: Operational State Validation via Targeted Neighbor Detail."""
-        vrf = getattr(self, "vrf", "default") or "default"
-
-        cmd_a = f"show ip ospf neighbor {self.local_int_name_a} detail"
-        cmd_b = f"show ip ospf neighbor {self.local_int_name_b} detail"
-        if vrf != "default":
-            cmd_a = f"show ip ospf vrf {vrf} neighbor {self.local_int_name_a} detail"
-            cmd_b = f"show ip ospf vrf {vrf} neighbor {self.local_int_name_b} detail"
+        cmd_a = f"{self.ospf_cmd_prefix} neighbor {self.local_int_name_a} detail"
+        cmd_b = f"{self.ospf_cmd_prefix} neighbor {self.local_int_name_b} detail"
 
-        def safe_parse(device, command):
+        def safe_parse(genie_dev, command):
             try:
-                return device.get_genie_device_object().parse(command)
+                return genie_dev.parse(command)
             except Exception:
                 return {}
 
-        view_a = self._extract_neighbor_map(safe_parse(self.device_a, cmd_a))
-        view_b = self._extract_neighbor_map(safe_parse(self.device_b, cmd_b))
+        raw_a, raw_b = self._parse_on_peers(cmd_a, cmd_b, safe_parse)
 
-        state_a_sees_b = view_a.get(self.rid_b, "DOWN")
-        state_b_sees_a = view_b.get(self.rid_a, "DOWN")
+        state_a_sees_b = self._find_neighbor_state(raw_a, self.rid_b)
+        state_b_sees_a = self._find_neighbor_state(raw_b, self.rid_a)
 
         if (
             state_a_sees_b != self.expected_state
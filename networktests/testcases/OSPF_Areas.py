@@ -1,12 +1,36 @@
-import ipaddress
+import functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Union
 
 from devices.models import Device
 from networktests.testcases.base import DiagNetTest, depends_on
-from pyats.async_ import pcall
 
 __author__ = "Luka Pacar"
 
+_BACKBONE_IDS = frozenset(("0.0.0.0", "BACKBONE"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_area_id(area_id: str) -> int:
+    """
+    Converts an area ID in decimal or dotted notation to its integer value (-1 if invalid).
+    Cached, as the same few area IDs recur for every device.
+    """
+    area_str = area_id.strip()
+    if area_str.isdigit():
+        return int(area_str)
+    area_str = area_str.upper()
+    if area_str in _BACKBONE_IDS:
+        return 0
+    # Dotted notation, decoded with plain integer math instead of ipaddress.
+    # isdigit() rejects the signs, underscores and inner whitespace int() would accept.
+    octets = area_str.split(".")
+    if len(octets) != 4 or not all(o.isdigit() and int(o) <= 255 for o in octets):
+        return -1
+    a, b, c, d = map(int, octets)
+    return (a << 24) | (b << 16) | (c << 8) | d
+
 
 class OSPF_Areas(DiagNetTest):
     """
@@ -153,64 +177,62 @@ class OSPF_Areas(DiagNetTest):
     ]
 
     def _normalize_area_id(self, area_id: Union[str, int]) -> int:
-        try:
-            area_str = str(area_id).upper().strip()
-            if any(x in area_str for x in ["BACKBONE", "0.0.0.0"]) or area_str == "0":
-                return 0
-            return (
-                int(ipaddress.IPv4Address(area_str))
-                if "." in area_str
-                else int(area_str)
-            )
-        except Exception:
-            return -1
+        if isinstance(area_id, int):
+            return area_id if area_id >= 0 else -1
+        return _normalize_area_id(str(area_id))
 
     def _get_operational_state(self, dev_data: Dict, target_instance: str) -> Dict:
         state = {
             "found": False,
             "all_configured_areas": set(),
-            "physically_active_areas": set(),
             "has_virtual_bb": False,
+            "has_active_bb": False,
             "area_details": {},
         }
 
         target_inst_str = str(target_instance)
-        vrfs = dev_data.get("vrf", {})
-
-        for vrf_data in vrfs.values():
-            af_v4 = vrf_data.get("address_family", {}).get("ipv4", {})
-            instances = af_v4.get("instance", {})
-
-            if target_inst_str in instances:
-                inst_data = instances[target_inst_str]
-                state["found"] = True
-                if inst_data.get("virtual_links"):
-                    state["has_virtual_bb"] = True
-
-                for aid_key, area_data in inst_data.get("areas", {}).items():
-                    norm_id = self._normalize_area_id(aid_key)
-                    state["all_configured_areas"].add(norm_id)
-
-                    stats = area_data.get("statistics", {})
-                    # Check for physical (non-loopback) interfaces
-                    phys_count = stats.get("interfaces_count", 0) - stats.get(
-                        "loopback_count", 0
-                    )
+        area_details = state["area_details"]
+        add_configured = state["all_configured_areas"].add
+
+        for vrf_data in dev_data.get("vrf", {}).values():
+            af = vrf_data.get("address_family")
+            v4 = af and af.get("ipv4")
+            instances = v4 and v4.get("instance")
+            if not instances or target_inst_str not in instances:
+                continue
+
+            inst_data = instances[target_inst_str]
+            state["found"] = True
+            if inst_data.get("virtual_links"):
+                state["has_virtual_bb"] = True
 
-                    if phys_count > 0:
-                        state["physically_active_areas"].add(norm_id)
+            for aid_key, area_data in inst_data.get("areas", {}).items():
+                norm_id = self._normalize_area_id(aid_key)
+                add_configured(norm_id)
 
-                    state["area_details"][norm_id] = {
-                        "active": phys_count > 0,
-                        "type": area_data.get("area_type", "normal").lower(),
-                        "no_summary": stats.get("stub_no_summary")
-                        or stats.get("nssa_no_summary"),
-                    }
+                stats = area_data.get("statistics", {})
+                # Check for physical (non-loopback) interfaces
+                phys_count = stats.get("interfaces_count", 0) - stats.get(
+                    "loopback_count", 0
+                )
+
+                if phys_count > 0 and norm_id == 0:
+                    state["has_active_bb"] = True
+
+                area_details[norm_id] = {
+                    "active": phys_count > 0,
+                    "type": area_data.get("area_type", "normal").lower(),
+                    "no_summary": stats.get("stub_no_summary")
+                    or stats.get("nssa_no_summary"),
+                }
+
+            # A process ID belongs to exactly one VRF; the remaining VRFs cannot hold it.
+            break
         return state
 
     def test_analyze_intent(self):
-        self.intended_topology = {}
-        self.area_intent_details = {}
+        intended_topology = defaultdict(set)
+        self.area_intent = {}
         type_map = {
             "Standard": "normal",
             "Stub Area": "stub",
@@ -225,11 +247,12 @@ class OSPF_Areas(DiagNetTest):
 
             for member_entry in area_def["members"]:
                 dev_name = member_entry["member"].name
-                self.intended_topology.setdefault(dev_name, set()).add(aid)
-                self.area_intent_details.setdefault(dev_name, {})[aid] = {
-                    "type": a_type,
-                    "no_summary": no_summ,
-                }
+                intended_topology[dev_name].add(aid)
+                self.area_intent[(dev_name, aid)] = (a_type, no_summ)
+
+        self.intended_topology = {
+            dev_name: frozenset(areas) for dev_name, areas in intended_topology.items()
+        }
 
     @depends_on("test_analyze_intent")
     def test_collect_telemetry(self):
@@ -246,8 +269,10 @@ class OSPF_Areas(DiagNetTest):
             except Exception as e:
                 return {"_collection_error": str(e)}
 
-        results = pcall(_fetch, device=device_list)
-        self.telemetry = {dev.name: res for dev, res in zip(device_list, results)}
+        # Collection is I/O bound, so threads avoid forking a process per device.
+        with ThreadPoolExecutor(max_workers=min(10, len(device_list) or 1)) as executor:
+            results = executor.map(_fetch, device_list)
+            self.telemetry = {dev.name: res for dev, res in zip(device_list, results)}
 
     @depends_on("test_collect_telemetry")
     def test_verify_architectural_compliance(self):
@@ -272,45 +297,43 @@ class OSPF_Areas(DiagNetTest):
                 )
                 continue
 
+            op_areas = op_state["all_configured_areas"]
+
             # Intent -> Reality
-            for aid in intended_areas:
-                if aid not in op_state["area_details"]:
-                    audit_errors.append(
-                        f"{dev_name}: Intended Area {aid} missing from config."
-                    )
-                    continue
+            for aid in intended_areas - op_areas:
+                audit_errors.append(
+                    f"{dev_name}: Intended Area {aid} missing from config."
+                )
 
+            for aid in intended_areas & op_areas:
                 actual = op_state["area_details"][aid]
                 if not actual["active"]:
                     audit_errors.append(
                         f"{dev_name}: Area {aid} Inactive (No transit adjacencies possible)."
                     )
 
-                intent = self.area_intent_details[dev_name][aid]
-                if actual["type"] != intent["type"]:
+                intent_type, intent_nosum = self.area_intent[(dev_name, aid)]
+                if actual["type"] != intent_type:
                     audit_errors.append(
-                        f"{dev_name} Area {aid}: Type Mismatch (Design={intent['type']}, Live={actual['type']})"
+                        f"{dev_name} Area {aid}: Type Mismatch (Design={intent_type}, Live={actual['type']})"
                     )
-                if intent["no_summary"] and not actual["no_summary"]:
+                if intent_nosum and not actual["no_summary"]:
                     audit_errors.append(f"{dev_name} Area {aid}: Missing 'no-summary'.")
 
             # Reality -> Intent
-            for op_aid in op_state["all_configured_areas"]:
-                if op_aid not in intended_areas:
-                    audit_errors.append(
-                        f"{dev_name}: Configuration Drift - Unintended Area {op_aid} found."
-                    )
+            for op_aid in op_areas - intended_areas:
+                audit_errors.append(
+                    f"{dev_name}: Configuration Drift - Unintended Area {op_aid} found."
+                )
 
             # When more than 1 area is connected -> Needs connection to Backbone Area
-            if len(op_state["all_configured_areas"]) > 1:
-                has_bb = (0 in op_state["physically_active_areas"]) or op_state[
-                    "has_virtual_bb"
-                ]
-                if not has_bb:
-                    audit_errors.append(
-                        f"{dev_name}: ARCHITECTURAL VIOLATION. Bridging areas {op_state['all_configured_areas']} "
-                        f"without active Area 0 transit."
-                    )
+            if len(op_areas) > 1 and not (
+                op_state["has_active_bb"] or op_state["has_virtual_bb"]
+            ):
+                audit_errors.append(
+                    f"{dev_name}: ARCHITECTURAL VIOLATION. Bridging areas {op_areas} "
+                    f"without active Area 0 transit."
+                )
 
         if audit_errors:
             error_report = "\n- " + "\n- ".join(audit_errors)
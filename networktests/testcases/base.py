@@ -11,7 +11,8 @@ __author__ = "Luka Pacar"
 __version__ = "1.2.4"
 
 from typing import Any, Dict, List
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+import threading
 import time
 
 
@@ -50,6 +51,12 @@ class MutuallyExclusiveGroupException(Exception):
     pass
 
 
+class MalformedParameterException(Exception):
+    """Exception raised when a parameter definition in _params is malformed."""
+
+    pass
+
+
 # Decorators
 def repeat(times: int, delay: int = 0):
     """
@@ -223,6 +230,105 @@ def get_parameter_names(
     return required_params, optional_params
 
 
+def compile_mutually_exclusive_groups(
+    groups: list[list[str]], required_params, known_params
+):
+    """
+    Validates the mutually exclusive groups of a test class once and records,
+    per group, whether its members are required.
+
+    Args:
+        groups (list): the _mutually_exclusive_parameters of the test class
+        required_params (tuple): names of the required parameters
+        known_params (frozenset): names of all declared parameters
+
+    Returns:
+        tuple: A tuple containing two elements:
+            - compiled_groups (tuple): (group, is_required) for every group.
+            - error (tuple | None): exception class and message of the first malformed group.
+    """
+    required_params = frozenset(required_params)
+    compiled_groups = []
+
+    for group in groups:
+        if len(group) < 2:
+            return (), (
+                IllegalGroupFormingException,
+                "Mutually Exclusive Group has to contain at least 2 elements.",
+            )
+
+        # elements of the mutually exclusive group have to exist as actual parameters.
+        for e in group:
+            if e not in known_params:
+                return (), (
+                    ParameterMissingException,
+                    f'Element "{e}" in mutually exclusive group "{group}" is not a defined parameter.',
+                )
+
+        # members of a mutually exclusive group have to all be in either "required" or "optional". (mixing them would not make sense)
+        required_count = sum(1 for e in group if e in required_params)
+        if required_count != 0 and required_count != len(group):
+            return (), (
+                IllegalGroupFormingException,
+                f"Unable to mix required and optional parameters in the mutually exclusive group: {group}",
+            )
+
+        compiled_groups.append((group, required_count != 0))
+
+    return tuple(compiled_groups), None
+
+
+TELEMETRY_CACHE_TTL = 2.0
+"""Seconds parsed device output may be reused by test runs that follow each other closely"""
+
+
+class TTLCache:
+    """
+    Small thread-safe cache whose entries expire a fixed number of seconds after they were stored.
+
+    Expired entries are pruned on every access, so a long-running server does not keep
+    the last output of every device it has ever tested.
+    Keys are tuples starting with the primary key of the device the entry belongs to.
+    """
+
+    __slots__ = ("ttl", "_entries", "_lock")
+
+    def __init__(self, ttl: float = TELEMETRY_CACHE_TTL):
+        self.ttl = ttl
+        # Insertion order equals expiry order, as every entry lives for the same ttl.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._entries:
+            key, (expires, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            del self._entries[key]
+
+    def get(self, key: tuple):
+        """Returns the value stored under key, or None if it is missing or expired."""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            entry = self._entries.get(key)
+            return entry[1] if entry and entry[0] > now else None
+
+    def set(self, key: tuple, value) -> None:
+        """Stores value under key for the next ttl seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+
+    def evict_device(self, device_pk) -> None:
+        """Drops every entry belonging to the given device."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == device_pk]:
+                del self._entries[key]
+
+
 class DiagNetTest:
     """
     Base class for defining and running test cases.
@@ -237,12 +343,63 @@ class DiagNetTest:
     and defining test methods.
     """
 
+    __slots__ = ()
+    """ Keeps the base dict-free so subclasses may opt into __slots__. """
+
     _params: List[Dict[str, Any]] = []
     """ Saves the parameters needed for this Test """
 
     _mutually_exclusive_parameters: List[List[str]] = []
     """ Saves which pairs of parameters are mutually exclusive. """
 
+    _required_param_names: tuple = ()
+    """ Names of the required parameters, derived from _params when the class is defined. """
+
+    _optional_param_names: tuple = ()
+    """ Names of the optional parameters, derived from _params when the class is defined. """
+
+    _param_names: frozenset = frozenset()
+    """ Names of all declared parameters, for constant-time membership checks. """
+
+    _mutually_exclusive_groups: tuple = ()
+    """ (group, is_required) per mutually exclusive group, validated when the class is defined. """
+
+    _mutually_exclusive_error: tuple | None = None
+    """ Exception class and message of a malformed mutually exclusive group, raised on run. """
+
+    _params_error: tuple | None = None
+    """ Exception class and message of a malformed _params entry, raised on run. """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Compiles the parameter names and mutually exclusive groups of every test class once,
+        at class-definition time, so parameter validation does not re-walk them on each run.
+        """
+        super().__init_subclass__(**kwargs)
+        try:
+            required_params, optional_params = get_parameter_names(
+                cls._get_required_params(), cls._get_optional_params()
+            )
+            cls._params_error = None
+        except (AttributeError, KeyError, TypeError) as e:
+            # Like malformed groups, a broken definition fails on run instead of hiding the class.
+            required_params, optional_params = [], []
+            cls._params_error = (
+                MalformedParameterException,
+                f"Malformed parameter definition in _params: {e!r}",
+            )
+        cls._required_param_names = tuple(required_params)
+        cls._optional_param_names = tuple(optional_params)
+        cls._param_names = frozenset(required_params) | frozenset(optional_params)
+
+        cls._mutually_exclusive_groups, cls._mutually_exclusive_error = (
+            compile_mutually_exclusive_groups(
+                cls._mutually_exclusive_parameters,
+                cls._required_param_names,
+                cls._param_names,
+            )
+        )
+
     def _setup(self) -> None:
         """
         Called before the execution of the test begins.
@@ -496,50 +653,35 @@ class DiagNetTest:
 
         #  --- 1. validate parameters ---
 
-        parsed_arguments: List[...] = list(kwargs.keys())
+        parsed_arguments = kwargs.keys()
 
-        # --- 1.1 Extract parameters and strip datatype from parameters ---
+        # --- 1.1 Parameter names compiled when the class was defined ---
 
-        required_params, optional_params = get_parameter_names(
-            self._get_required_params(), self._get_optional_params()
-        )
-        mutually_exclusive_groups = self._mutually_exclusive_parameters
+        required_params = self._required_param_names
+        known_params = self._param_names
+
+        # malformed parameter definitions were detected when the class was defined.
+        if self._params_error is not None:
+            exception, message = self._params_error
+            raise exception(message)
 
         # --- 1.2 Check mutually exclusive validity ---
 
+        # malformed groups were detected when the class was defined.
+        if self._mutually_exclusive_error is not None:
+            exception, message = self._mutually_exclusive_error
+            raise exception(message)
+
         mutually_ignored_arguments: List[...] = []
 
         # check mutually exclusive parameters
-        for mutually_exclusive_pairs in mutually_exclusive_groups:
-            if len(mutually_exclusive_pairs) < 2:
-                raise IllegalGroupFormingException(
-                    "Mutually Exclusive Group has to contain at least 2 elements."
-                )
-
-            # elements of the mutually exclusive pair have to exist as actual parameters.
-            for e in mutually_exclusive_pairs:
-                if e not in required_params and e not in optional_params:
-                    raise ParameterMissingException(
-                        f'Element "{e}" in mutually exclusive group "{mutually_exclusive_pairs}" is not a defined parameter.'
-                    )
-
-            # members of a mutually exclusive group have to all be in either "required" or "optional". (mixing them would not make sense)
-            required_count = sum(
-                1 for e in mutually_exclusive_pairs if e in required_params
-            )
-            if required_count != 0 and required_count is not len(
-                mutually_exclusive_pairs
-            ):
-                raise IllegalGroupFormingException(
-                    f"Unable to mix required and optional parameters in the mutually exclusive group: {mutually_exclusive_pairs}"
-                )
-
+        for mutually_exclusive_pairs, is_required in self._mutually_exclusive_groups:
             # Count number of parsed elements.
             parsed_elements = sum(
                 1 for e in mutually_exclusive_pairs if e in parsed_arguments
             )
 
-            if required_count == 0:  # Optional parameter.
+            if not is_required:  # Optional parameter.
                 if parsed_elements > 1:
                     raise MutuallyExclusiveGroupException(
                         f"Unable to process 2 or more parsed parameters of the same mutually exclusive group: {mutually_exclusive_pairs}"
@@ -571,10 +713,6 @@ class DiagNetTest:
             raise ParameterMissingException(f"Missing required parameters: {missing}")
 
         # unknown parameters
-        unknown = [
-            k
-            for k in parsed_arguments
-            if k not in required_params and k not in optional_params
-        ]
+        unknown = [k for k in parsed_arguments if k not in known_params]
         if unknown:
             raise UnknownParameterException(f"Unknown parameters passed: {unknown}")
@@ -1,3 +1,4 @@
+import ipaddress
 import os
 import shutil
 import tempfile
@@ -13,7 +14,22 @@ from .models import (
     TestGroup,
     TestResult,
 )
-from .testcases.base import DiagNetTest
+from .testcases.base import (
+    DiagNetTest,
+    IllegalGroupFormingException,
+    MalformedParameterException,
+    ParameterMissingException,
+    TTLCache,
+    UnknownParameterException,
+)
+from .testcases.NAT import (
+    _TRANSLATION_RE,
+    _canonical_interface,
+    _clean_ip,
+    _read_translations,
+)
+from .testcases.OSPF_Adjacency import _network_key
+from .testcases.OSPF_Areas import OSPF_Areas, _normalize_area_id
 from .utils import (
     get_all_available_test_classes,
     get_builtin_test_class_names,
@@ -315,6 +331,290 @@ class TestClassValidationTests(TestCase):
             shutil.rmtree(test_dir)
 
 
+class ParameterValidationTests(TestCase):
+    """Tests for the parameter names compiled from _params."""
+
+    class ParamTest(DiagNetTest):
+        _params = [
+            {"name": "device", "type": "device", "requirement": "required"},
+            {"name": "vrf", "type": "str", "requirement": "optional"},
+        ]
+
+        def test_example(self):
+            return True
+
+    def test_parameter_names_compiled_at_class_definition(self):
+        """Test that required and optional names are derived once per class."""
+        self.assertEqual(self.ParamTest._required_param_names, ("device",))
+        self.assertEqual(self.ParamTest._optional_param_names, ("vrf",))
+        self.assertEqual(self.ParamTest._param_names, {"device", "vrf"})
+
+    def test_missing_required_parameter(self):
+        """Test that a missing required parameter is rejected."""
+        with self.assertRaises(ParameterMissingException):
+            self.ParamTest().run(vrf="default")
+
+    def test_unknown_parameter(self):
+        """Test that an undeclared parameter is rejected."""
+        with self.assertRaises(UnknownParameterException):
+            self.ParamTest().run(device="R1", bogus="value")
+
+    def test_malformed_mutually_exclusive_group_rejected_on_run(self):
+        """Test that a group mixing required and optional parameters fails when run, not when defined."""
+
+        class MixedGroupTest(self.ParamTest):
+            _mutually_exclusive_parameters = [["device", "vrf"]]
+
+        self.assertEqual(MixedGroupTest._mutually_exclusive_groups, ())
+        with self.assertRaises(IllegalGroupFormingException):
+            MixedGroupTest().run(device="R1")
+
+    def test_malformed_parameter_definition_rejected_on_run(self):
+        """Test that a _params entry without a name fails when run, not when defined."""
+
+        class NamelessParamTest(DiagNetTest):
+            _params = [{"type": "str", "requirement": "required"}]
+
+            def test_example(self):
+                return True
+
+        with self.assertRaises(MalformedParameterException):
+            NamelessParamTest().run()
+
+    def test_builtin_test_classes_define_valid_parameters(self):
+        """Test that every built-in test class has well-formed _params."""
+        with override_settings(ENABLE_CUSTOM_TESTCASES=False):
+            classes = get_all_available_test_classes()
+        for name, entry in classes.items():
+            with self.subTest(test_class=name):
+                self.assertIsNone(entry["class"]._params_error)
+
+
+class TTLCacheTests(TestCase):
+    """Tests for the telemetry cache shared by the test cases."""
+
+    def test_value_is_returned_until_it_expires(self):
+        """Test that a stored value is returned while fresh and dropped once expired."""
+        cache = TTLCache(ttl=60)
+        cache.set((1, "show ip ospf"), {"vrf": {}})
+        self.assertEqual(cache.get((1, "show ip ospf")), {"vrf": {}})
+        self.assertIsNone(cache.get((2, "show ip ospf")))
+
+        cache.ttl = 0
+        cache.set((1, "show ip nat statistics"), {})
+        self.assertIsNone(cache.get((1, "show ip nat statistics")))
+
+    def test_expired_entries_are_pruned(self):
+        """Test that expired entries do not stay in memory."""
+        cache = TTLCache(ttl=0)
+        for pk in range(10):
+            cache.set((pk, "show ip ospf"), {})
+        cache.get((0, "show ip ospf"))
+        self.assertEqual(len(cache._entries), 0)
+
+    def test_evict_device(self):
+        """Test that evicting a device drops all of its entries and nothing else."""
+        cache = TTLCache(ttl=60)
+        cache.set((1, "show ip ospf", "default"), {})
+        cache.set((1, "show ip ospf interface", "default"), {})
+        cache.set((2, "show ip ospf", "default"), {"kept": True})
+        cache.evict_device(1)
+        self.assertIsNone(cache.get((1, "show ip ospf", "default")))
+        self.assertIsNone(cache.get((1, "show ip ospf interface", "default")))
+        self.assertEqual(cache.get((2, "show ip ospf", "default")), {"kept": True})
+
+
+IOS_NAT_TRANSLATIONS = """Pro Inside global      Inside local       Outside local      Outside global
+--- 171.69.233.209     192.168.1.95       ---                ---
+--- 171.69.233.210     192.168.1.89       ---                ---
+tcp 171.69.233.209:11012 192.168.1.95:11012 171.69.2.132:53   171.69.2.132:53
+"""
+
+IOS_XE_NAT_TRANSLATIONS = """Pro  Inside global         Inside local          Outside local         Outside global
+udp  10.5.5.1:1025         192.0.2.1:4000        ---                   ---
+icmp 10.10.10.1:2          172.16.1.1:2          10.1.1.1:2            10.1.1.1:2
+---  203.0.113.10          10.0.0.10             ---                   ---
+Total number of translations: 3
+"""
+
+IOS_XE_NAT_TRANSLATIONS_VERBOSE = """Pro  Inside global         Inside local          Outside local         Outside global
+tcp  10.5.5.1:1025         192.0.2.1:4000        198.51.100.7:80       198.51.100.7:80
+  create: 02/15/24 10:11:12, use: 02/15/24 10:11:14, timeout: 00:00:58
+  RuntimeFlags: Insert-Event, Entry-id: 0x1, Use_count:1
+Total number of translations: 1
+"""
+
+
+class NATParsingTests(TestCase):
+    """Tests for the NAT test case's output helpers, using sample IOS/IOS-XE output."""
+
+    def test_translation_row_fields(self):
+        """Test that a translation row is split into its four address columns."""
+        match = _TRANSLATION_RE.match(
+            "tcp 171.69.233.209:11012 192.168.1.95:11012 171.69.2.132:53   171.69.2.132:53"
+        )
+        self.assertEqual(
+            match.groupdict(),
+            {
+                "protocol": "tcp",
+                "inside_global": "171.69.233.209:11012",
+                "inside_local": "192.168.1.95:11012",
+                "outside_local": "171.69.2.132:53",
+                "outside_global": "171.69.2.132:53",
+            },
+        )
+        self.assertIsNone(_TRANSLATION_RE.match("Total number of translations: 3"))
+
+    def test_read_ios_translations(self):
+        """Test that every row of classic IOS output is read."""
+        rows = _read_translations(IOS_NAT_TRANSLATIONS)
+        self.assertEqual(
+            [(row["inside_local"], row["inside_global"]) for row in rows],
+            [
+                ("192.168.1.95", "171.69.233.209"),
+                ("192.168.1.89", "171.69.233.210"),
+                ("192.168.1.95:11012", "171.69.233.209:11012"),
+            ],
+        )
+
+    def test_read_ios_xe_translations(self):
+        """Test that IOS-XE output with a summary line is read completely."""
+        rows = _read_translations(IOS_XE_NAT_TRANSLATIONS)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]["protocol"], "---")
+        self.assertEqual(rows[2]["outside_local"], "---")
+
+    def test_read_empty_translation_table(self):
+        """Test that a table with only its header and summary has no rows."""
+        self.assertEqual(
+            _read_translations(
+                "Pro Inside global  Inside local  Outside local  Outside global\n"
+                "Total number of translations: 0\n"
+            ),
+            [],
+        )
+        self.assertEqual(_read_translations(""), [])
+
+    def test_unrecognised_lines_fall_back(self):
+        """Test that output with unrecognised lines is left to Genie instead of losing rows."""
+        self.assertIsNone(_read_translations(IOS_XE_NAT_TRANSLATIONS_VERBOSE))
+
+    def test_clean_ip(self):
+        """Test that ports are stripped and other values are kept."""
+        self.assertEqual(_clean_ip("192.168.1.95:11012"), "192.168.1.95")
+        self.assertEqual(_clean_ip("171.69.233.209"), "171.69.233.209")
+        self.assertEqual(_clean_ip("---"), "---")
+        self.assertIsNone(_clean_ip(None))
+
+    def test_canonical_interface(self):
+        """Test that abbreviated and full interface names compare equal."""
+        self.assertEqual(
+            _canonical_interface("Gi0/0/1"),
+            _canonical_interface("GigabitEthernet0/0/1"),
+        )
+        self.assertEqual(_canonical_interface("Fa0/1"), "fastethernet0/1")
+        self.assertEqual(_canonical_interface("lo0"), "loopback0")
+        self.assertEqual(_canonical_interface("Po10"), "port-channel10")
+        self.assertEqual(_canonical_interface(" Vlan100 "), "vlan100")
+        self.assertEqual(_canonical_interface("Tu0"), "tunnel0")
+        # Unknown prefixes are only lower-cased.
+        self.assertEqual(_canonical_interface("Ethernet0/1"), "ethernet0/1")
+
+
+class OSPFAreaIdTests(TestCase):
+    """Tests for the OSPF area ID normalisation."""
+
+    def test_backbone_ids(self):
+        """Test that every notation of area 0 is recognised as the backbone."""
+        for area_id in ("0", "0.0.0.0", "backbone", " Backbone "):
+            with self.subTest(area_id=area_id):
+                self.assertEqual(_normalize_area_id(area_id), 0)
+        self.assertEqual(OSPF_Areas()._normalize_area_id(0), 0)
+
+    def test_non_backbone_ids(self):
+        """Test that IDs merely containing a backbone notation are not the backbone."""
+        self.assertEqual(_normalize_area_id("10.0.0.0"), 167772160)
+        self.assertEqual(_normalize_area_id("100.0.0.0"), 1677721600)
+        self.assertEqual(_normalize_area_id("1"), 1)
+        self.assertEqual(_normalize_area_id("0.0.0.1"), 1)
+        self.assertEqual(OSPF_Areas()._normalize_area_id(7), 7)
+
+    def test_dotted_and_decimal_ids_match(self):
+        """Test that the dotted and decimal notation of an area ID normalise to the same value."""
+        for dotted, decimal in (
+            ("0.0.0.5", "5"),
+            ("0.1.0.0", "65536"),
+            ("10.0.0.0", "167772160"),
+        ):
+            with self.subTest(dotted=dotted):
+                self.assertEqual(
+                    _normalize_area_id(dotted), _normalize_area_id(decimal)
+                )
+
+    def test_invalid_ids_rejected(self):
+        """Test that malformed area IDs normalise to -1."""
+        for area_id in (
+            "1_0.0.0.0",
+            "+1.0.0.0",
+            "1. 0.0.0",
+            "1.2.3",
+            "1.2.3.256",
+            "x.y",
+            "-1",
+            "1_0",
+            "",
+        ):
+            with self.subTest(area_id=area_id):
+                self.assertEqual(_normalize_area_id(area_id), -1)
+        self.assertEqual(OSPF_Areas()._normalize_area_id(-3), -1)
+
+
+class OSPFNetworkKeyTests(TestCase):
+    """Tests for the subnet key used to match OSPF peers."""
+
+    def assertMatchesIpaddress(self, address):
+        network = ipaddress.ip_interface(address).network
+        self.assertEqual(
+            _network_key(address), (int(network.network_address), network.prefixlen)
+        )
+
+    def test_prefix_and_netmask_notation_agree(self):
+        """Test that prefix and netmask notation give the same key as ipaddress."""
+        for address in (
+            "10.0.12.1/24",
+            "10.0.12.1/255.255.255.0",
+            "192.168.1.130/26",
+            "192.168.1.130/255.255.255.192",
+            "0.0.0.0/0",
+        ):
+            with self.subTest(address=address):
+                self.assertMatchesIpaddress(address)
+        self.assertEqual(
+            _network_key("10.0.12.1/24"), _network_key("10.0.12.1/255.255.255.0")
+        )
+
+    def test_host_routes(self):
+        """Test that /32 and addresses without a prefix are treated as host routes."""
+        for address in ("172.16.0.1/32", "172.16.0.1"):
+            with self.subTest(address=address):
+                self.assertMatchesIpaddress(address)
+                self.assertEqual(_network_key(address)[1], 32)
+
+    def test_malformed_addresses_rejected(self):
+        """Test that malformed addresses raise a ValueError instead of producing a key."""
+        for address in (
+            "10.0.12/24",
+            "10.0.12.256/24",
+            "10.0.12.1/33",
+            "+10.0.12.1/24",
+            "1_0.0.12.1/24",
+            "not-an-ip",
+        ):
+            with self.subTest(address=address):
+                with self.assertRaises(ValueError):
+                    _network_key(address)
+
+
 class NetworkTestsPermissionTests(TestCase):
     def setUp(self):
         # Create a superuser to satisfy SuperuserRequiredMiddleware